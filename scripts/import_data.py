@@ -9,12 +9,23 @@ Usage:
   uv run python scripts/import_data.py data/health_data.csv
 """
 
+import csv
+import re
 import sys
+from contextlib import contextmanager
 from datetime import date as Date
 from datetime import datetime
+from functools import lru_cache
+from io import StringIO
+from itertools import islice
+from os import environ
 from pathlib import Path
+from typing import Iterator
 
+import numpy as np
 import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
 # Ensure project root is importable BEFORE importing app modules
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -24,6 +35,68 @@ from physiolog import create_app
 from physiolog.extensions import db
 from physiolog.models import HealthEntry
 
+# distinct date strings remembered by parse_date
+CACHE_SIZE = 131072
+
+PLACEHOLDERS = ["", "--"]
+
+# pandas' default na_values, given to pyarrow so both readers agree on nulls
+NA_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+# accepted date formats, tried in this order
+DATE_FORMATS = ["%d/%m/%Y", "%Y-%m-%d", "%m/%d/%Y", "%d-%m-%Y"]
+
+# relaxed durability while importing into SQLite, restored afterwards
+SQLITE_IMPORT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": "-200000",  # negative means KiB, i.e. ~200 MB
+}
+
+# HealthEntry field -> alternative sets of keywords; a column maps to the
+# first field for which every keyword of one set starts a word of its name
+COLUMN_KEYWORDS: list[tuple[str, list[set[str]]]] = [
+    ("date", [{"date"}]),
+    ("weight", [{"weight", "kg"}]),
+    ("body_fat", [{"body", "fat"}, {"bodyfat"}]),
+    ("calories", [{"calorie"}]),
+    ("steps", [{"step"}]),
+    ("sleep_total", [{"sleep", "total"}]),
+    ("sleep_quality", [{"sleep", "quality"}]),
+    ("observations", [{"observation"}, {"note"}]),
+]
+_WORD_RE = re.compile(r"[a-z]+")
+
+# 'h:mm[:ss]'; single-digit minutes and seconds ('7:5') are accepted too
+_TIME_RE = re.compile(r"^\s*(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?\s*$")
+
+# rows per INSERT/COMMIT; tune per database with IMPORT_BATCH_SIZE
+BATCH_SIZE = int(environ.get("IMPORT_BATCH_SIZE", "10000"))
+
+# rows parsed at a time; tune memory use with IMPORT_CHUNK_SIZE
+CHUNK_SIZE = int(environ.get("IMPORT_CHUNK_SIZE", "50000"))
+
 
 def parse_time(time_str: str) -> float | None:
     """
@@ -40,29 +113,20 @@ def parse_time(time_str: str) -> float | None:
     if time_str in ("", "--"):
         return None
 
-    parts = time_str.split(":")
-    if len(parts) < 2:
+    match = _TIME_RE.match(time_str)
+    if match is None:
         raise ValueError(f"Invalid time format: {time_str!r}. Expected 'h:mm[:ss]'")
 
-    try:
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds = int(parts[2]) if len(parts) == 3 else 0
-    except ValueError as exc:
-        raise ValueError(
-            f"Invalid time format: {time_str!r}. Expected 'h:mm[:ss]'"
-        ) from exc
-
-    # Proper range checks
-    if hours < 0 or hours > 24:
+    hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    if hours > 24:
         raise ValueError(
             f"Invalid time format: {time_str!r}. Hours must be between 0 and 24"
         )
-    if minutes < 0 or minutes >= 60:
+    if minutes >= 60:
         raise ValueError(
             f"Invalid time format: {time_str!r}. Minutes must be between 0 and 59"
         )
-    if seconds < 0 or seconds >= 60:
+    if seconds >= 60:
         raise ValueError(
             f"Invalid time format: {time_str!r}. Seconds must be between 0 and 59"
         )
@@ -98,59 +162,351 @@ def parse_date(date_str) -> Date | None:
     """
     if date_str is None or pd.isna(date_str) or date_str == "--" or date_str == "":
         return None
+    return _parse_date(str(date_str).strip())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_date(date_str: str) -> Date | None:
+    """
+    Cached worker of `parse_date`; each distinct string runs `strptime` once.
+    """
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def detect_date_format(dates: pd.Series, sample: int = 20) -> str | None:
+    """
+    Return the first format of DATE_FORMATS that parses the first `sample`
+    non-missing values of `dates`, or None if no single format fits them all.
+    """
+    values = dates.dropna().head(sample).tolist()
+    if not values:
+        return None
 
-    formats = ["%d/%m/%Y", "%Y-%m-%d", "%m/%d/%Y", "%d-%m-%Y"]
-    s = str(date_str).strip()
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
-            return datetime.strptime(s, fmt).date()
+            for value in values:
+                datetime.strptime(value, fmt)
         except ValueError:
             continue
+        return fmt
     return None
 
 
+def map_columns(columns: list[str]) -> dict[str, str]:
+    """
+    Map `HealthEntry` fields to file columns by the words in each column name,
+    e.g. 'Weight (kg)' -> 'weight'. camelCase names are split into words
+    first ('BodyFat' -> 'body fat'). See COLUMN_KEYWORDS.
+    """
+    lowered = (
+        pd.Index(columns)
+        .str.strip()
+        .str.replace(r"([a-z])([A-Z])", r"\1 \2", regex=True)
+        .str.lower()
+        .tolist()
+    )
+
+    column_map: dict[str, str] = {}
+    for col, col_lower in zip(columns, lowered):
+        words = _WORD_RE.findall(col_lower)
+        for key, keyword_sets in COLUMN_KEYWORDS:
+            if any(
+                all(any(word.startswith(k) for word in words) for k in keywords)
+                for keywords in keyword_sets
+            ):
+                column_map[key] = col
+                break
+    return column_map
+
+
+def detect_separator(filepath: str, sample: int = 20) -> str:
+    """
+    Return the field separator of a CSV/TSV file. '.tsv' files are always
+    tab-separated. Otherwise ',' is assumed unless exactly one of ',', ';' or
+    tab splits the first `sample` lines into the same number (> 1) of fields.
+    """
+    if filepath.endswith(".tsv"):
+        return "\t"
+
+    with open(filepath, encoding="utf-8") as f:
+        lines = [line for line in islice(f, sample) if line.strip()]
+
+    candidates = []
+    for sep in (",", ";", "\t"):
+        widths = {len(row) for row in csv.reader(lines, delimiter=sep)}
+        if len(widths) == 1 and widths.pop() > 1:
+            candidates.append(sep)
+    return candidates[0] if len(candidates) == 1 else ","
+
+
+def read_columns(filepath: str, sep: str) -> list[str]:
+    """
+    Return the column names from the header of a CSV/TSV file.
+    """
+    return pd.read_csv(filepath, sep=sep, encoding="utf-8", nrows=0).columns.tolist()
+
+
+def read_chunks(
+    filepath: str,
+    sep: str,
+    columns: list[str],
+    usecols: list[str],
+    chunksize: int = CHUNK_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the `usecols` columns of a CSV/TSV file as DataFrames of roughly
+    `chunksize` rows so large files are parsed and imported without loading
+    them whole into memory. Each frame is indexed by file line number
+    (the header is line 1).
+
+    pandas' pyarrow engine cannot stream, so pyarrow's incremental CSV
+    reader is used directly when available. It is given the header names
+    from `read_columns`, so duplicated or blank headers ('Steps.1',
+    'Unnamed: 2') resolve as in pandas, and every column is read as text,
+    otherwise types inferred from the first block could reject later ones.
+    Rows with missing trailing fields, which pyarrow rejects, are parsed
+    with pandas and padded with NA as pandas does.
+    Without pyarrow, pandas' C parser is used with `chunksize`. Both paths
+    read text and treat pandas' NA strings ('None', '<NA>', ...) as missing.
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        for chunk in pd.read_csv(
+            filepath,
+            sep=sep,
+            encoding="utf-8",
+            usecols=usecols,
+            dtype="string",
+            chunksize=chunksize,
+        ):
+            yield chunk.set_axis(chunk.index + 2)
+        return
+
+    short_rows: list[tuple[int, str]] = []  # (file line, raw text)
+
+    def keep_short_row(row) -> str:
+        if row.actual_columns < row.expected_columns:
+            short_rows.append((row.number, row.text))
+            return "skip"
+        return "error"
+
+    reader = pa_csv.open_csv(
+        filepath,
+        read_options=pa_csv.ReadOptions(column_names=columns, skip_rows=1),
+        parse_options=pa_csv.ParseOptions(
+            delimiter=sep, invalid_row_handler=keep_short_row
+        ),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: pa.string() for col in usecols},
+            include_columns=usecols,
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+
+    def to_frame(
+        batches: list[pa.RecordBatch], first: int, last: bool
+    ) -> tuple[pd.DataFrame, int]:
+        """
+        Merge `batches`, starting at file line `first`, with the short rows
+        skipped in between (all remaining ones if `last`).
+        """
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+        frame = table.to_pandas(types_mapper=pd.ArrowDtype)
+
+        # skipped short rows push the end of this chunk further down the file
+        end = first + len(frame) - 1
+        short: list[tuple[int, str]] = []
+        for line, raw in sorted(short_rows):
+            if line >= first and (last or line <= end):
+                short.append((line, raw))
+                end += 1
+        short_lines = {line for line, _ in short}
+        lines = [line for line in range(first, end + 1) if line not in short_lines]
+        frame = frame.set_axis(lines[: len(frame)])
+        if short:
+            padded = pd.read_csv(
+                StringIO("\n".join(raw for _, raw in short)),
+                sep=sep,
+                header=None,
+                names=columns,
+                dtype="string",
+            )[usecols].set_axis([line for line, _ in short])
+            frame = pd.concat([frame, padded]).sort_index()
+        return frame, end + 1
+
+    batches: list[pa.RecordBatch] = []
+    rows = 0
+    first = 2
+    for batch in reader:
+        batches.append(batch)
+        rows += batch.num_rows
+        if rows >= chunksize:
+            frame, first = to_frame(batches, first, last=False)
+            yield frame
+            batches, rows = [], 0
+    if batches or any(line >= first for line, _ in short_rows):
+        frame, _ = to_frame(batches, first, last=True)
+        yield frame
+
+
+def _text(series: pd.Series) -> pd.Series:
+    """
+    Return `series` as stripped strings with placeholders ('', '--') set to NA.
+    """
+    values = series.astype("string").str.strip()
+    return values.mask(values.isin(PLACEHOLDERS))
+
+
+def _numbers(text: pd.Series) -> pd.Series:
+    """
+    Vectorized `parse_number` on the output of `_text`: comma decimals are
+    accepted and unparseable or non-finite values ('inf') become NaN.
+    """
+    values = text.str.replace(",", ".", regex=False)
+    numbers = pd.to_numeric(values, errors="coerce").astype("float64")
+    return numbers.where(np.isfinite(numbers))
+
+
+def _hours(text: pd.Series) -> pd.Series:
+    """
+    Vectorized `parse_time` on the output of `_text`: 'h:mm[:ss]' strings
+    become decimal hours, invalid values become NaN.
+    """
+    parts = text.str.extract(_TIME_RE).astype("float64")
+    hours, minutes, seconds = parts[0], parts[1], parts[2].fillna(0)
+    valid = (hours <= 24) & (minutes < 60) & (seconds < 60)
+    return (hours + minutes / 60 + seconds / 3600).where(valid).round(2)
+
+
+def clean_frame(
+    df: pd.DataFrame, column_map: dict[str, str]
+) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Convert the raw columns of `df` into a frame with one column per
+    `HealthEntry` field, parsing whole columns at once instead of cell by cell.
+
+    Rows with a missing or unparseable date, or with a number or time that
+    `parse_number`/`parse_time` would reject, are dropped. They are returned
+    as a second value: a Series indexed like `df` naming the failed fields,
+    e.g. 'steps, sleep_total'.
+    """
+    clean = pd.DataFrame(index=df.index)
+    dates = _text(df[column_map["date"]])
+    fmt = detect_date_format(dates)
+    if fmt is not None:
+        clean["date"] = pd.to_datetime(dates, format=fmt, errors="coerce", cache=True)
+    else:
+        clean["date"] = pd.NaT
+
+    # values not matching the detected format fall back to trying every format
+    rest = clean["date"].isna() & dates.notna()
+    if rest.any():
+        clean.loc[rest, "date"] = pd.to_datetime(dates[rest].map(parse_date))
+
+    failed = pd.DataFrame({"date": clean["date"].isna()})
+    for key in ("weight", "body_fat", "calories", "steps", "sleep_total"):
+        col = column_map.get(key)
+        if col is None:
+            clean[key] = np.nan
+            continue
+        text = _text(df[col])
+        clean[key] = _hours(text) if key == "sleep_total" else _numbers(text)
+        failed[key] = clean[key].isna() & text.notna()
+
+    # counts are whole numbers: truncate like int() into nullable integers
+    for key in ("calories", "steps"):
+        clean[key] = np.trunc(clean[key]).astype("Int64")
+
+    # free text is kept as written; only sleep quality treats '--' as missing
+    for key, missing in (("sleep_quality", ["--"]), ("observations", [])):
+        col = column_map.get(key)
+        if col is None:
+            clean[key] = None
+            continue
+        values = df[col].astype("string")
+        clean[key] = values.mask(values.isin(missing))
+
+    invalid = failed.any(axis=1)
+    reasons = pd.Series(
+        [", ".join(failed.columns[row]) for row in failed[invalid].to_numpy()],
+        index=failed.index[invalid],
+        dtype=object,
+    )
+    clean = clean[~invalid].assign(date=lambda frame: frame["date"].dt.date)
+    return clean, reasons
+
+
+def _to_records(frame: pd.DataFrame) -> list[dict[str, object]]:
+    """
+    Return the rows of `frame` as dicts for `bulk_insert_mappings`, with
+    missing values as None. Rows are built by zipping whole column arrays,
+    so no per-row Series is created.
+    """
+    fields = frame.columns.tolist()
+    arrays = [
+        frame[field].astype(object).where(frame[field].notna(), None).to_numpy()
+        for field in fields
+    ]
+    return [dict(zip(fields, row)) for row in zip(*arrays)]
+
+
+@contextmanager
+def sqlite_import_pragmas() -> Iterator[None]:
+    """
+    Apply SQLITE_IMPORT_PRAGMAS for the duration of the block so commits do
+    not wait on fsync, and restore the previous settings on exit.
+    Does nothing on other databases. Requires an app context.
+    """
+    if db.engine.dialect.name != "sqlite":
+        yield
+        return
+
+    previous = {
+        name: db.session.execute(text(f"PRAGMA {name}")).scalar()
+        for name in SQLITE_IMPORT_PRAGMAS
+    }
+    for name, value in SQLITE_IMPORT_PRAGMAS.items():
+        db.session.execute(text(f"PRAGMA {name}={value}"))
+    try:
+        yield
+    finally:
+        db.session.rollback()
+        for name, value in previous.items():
+            db.session.execute(text(f"PRAGMA {name}={value}"))
+        db.session.commit()
+
+
 def import_data(app, filepath: str) -> None:
     """
     Imports health data from a CSV or TSV file into the database.
     """
     print(f"\n📊 Importing data from {filepath}...")
 
-    sep = "\t" if filepath.endswith(".tsv") else ","
-    df = pd.read_csv(filepath, sep=sep, encoding="utf-8")
+    sep = detect_separator(filepath)
+    columns = read_columns(filepath, sep)
 
-    print(f"\n📋 Found columns: {list(df.columns)}\n")
+    print(f"\n📋 Found columns: {columns}\n")
 
-    column_map: dict[str, str] = {}
-    for col in df.columns:
-        col_lower = col.lower().strip()
-        if "date" in col_lower:
-            column_map["date"] = col
-        elif "weight" in col_lower and "kg" in col_lower:
-            column_map["weight"] = col
-        elif "body" in col_lower and "fat" in col_lower:
-            column_map["body_fat"] = col
-        elif "calorie" in col_lower:
-            column_map["calories"] = col
-        elif "step" in col_lower:
-            column_map["steps"] = col
-        elif "sleep total" in col_lower or (
-            ("sleep" in col_lower) and ("total" in col_lower)
-        ):
-            column_map["sleep_total"] = col
-        elif "sleep quality" in col_lower or (
-            ("sleep" in col_lower) and ("quality" in col_lower)
-        ):
-            column_map["sleep_quality"] = col
-        elif "observation" in col_lower or "notes" in col_lower:
-            column_map["observations"] = col
+    column_map = map_columns(columns)
 
     print(f"📌 Mapped columns: {column_map}\n")
 
     if "date" not in column_map:
         print("❌ Error: Could not find a 'Date' column!")
-        print(f"Available columns: {list(df.columns)}")
+        print(f"Available columns: {columns}")
         sys.exit(1)
 
+    # only the mapped columns are parsed
+    usecols = list(column_map.values())
+
     added = 0
     skipped = 0
     errors = 0
@@ -158,62 +514,38 @@ def import_data(app, filepath: str) -> None:
     with app.app_context():
         db.create_all()
 
-        for idx, row in df.iterrows():
-            try:
-                entry_date = parse_date(row[column_map["date"]])
-                if not entry_date:
-                    errors += 1
-                    continue
-
-                existing = HealthEntry.query.filter_by(date=entry_date).first()
-                if existing:
-                    skipped += 1
-                    continue
-
-                calories_val = (
-                    parse_number(row.get(column_map.get("calories")))
-                    if "calories" in column_map
-                    else None
-                )
-                steps_val = (
-                    parse_number(row.get(column_map.get("steps")))
-                    if "steps" in column_map
-                    else None
-                )
-
-                entry = HealthEntry(
-                    date=entry_date,
-                    weight=parse_number(row.get(column_map.get("weight")))
-                    if "weight" in column_map
-                    else None,
-                    body_fat=parse_number(row.get(column_map.get("body_fat")))
-                    if "body_fat" in column_map
-                    else None,
-                    calories=int(calories_val) if calories_val is not None else None,
-                    steps=int(steps_val) if steps_val is not None else None,
-                    sleep_total=parse_time(row.get(column_map.get("sleep_total")))
-                    if "sleep_total" in column_map
-                    else None,
-                    sleep_quality=row.get(column_map.get("sleep_quality"))
-                    if "sleep_quality" in column_map
-                    and pd.notna(row.get(column_map.get("sleep_quality")))
-                    and row.get(column_map.get("sleep_quality")) != "--"
-                    else None,
-                    observations=row.get(column_map.get("observations"))
-                    if "observations" in column_map
-                    and pd.notna(row.get(column_map.get("observations")))
-                    else None,
-                )
-
-                db.session.add(entry)
-                added += 1
-
-            except Exception as e:
-                errors += 1
-                print(f"⚠️  Error on row {idx + 1}: {e}")
-                continue
+        # dates already stored, plus those added while importing this file;
+        # one SELECT up front instead of one per row
+        existing: set[Date] = set(db.session.scalars(db.select(HealthEntry.date)))
+
+        # rows are written with bulk inserts and never read back as ORM
+        # objects, so skip autoflush and expiring the session on each commit
+        db.session().expire_on_commit = False
+        with sqlite_import_pragmas(), db.session.no_autoflush:
+            for chunk in read_chunks(filepath, sep, columns, usecols, CHUNK_SIZE):
+                clean, rejected = clean_frame(chunk, column_map)
+                errors += len(rejected)
+                for line, fields in rejected.items():
+                    print(f"⚠️  Error on row {line}: invalid {fields}")
+
+                new = clean[~clean["date"].isin(existing)].drop_duplicates("date")
+                skipped += len(clean) - len(new)
+
+                records = _to_records(new)
+
+                for start in range(0, len(records), BATCH_SIZE):
+                    batch = records[start : start + BATCH_SIZE]
+                    try:
+                        db.session.bulk_insert_mappings(HealthEntry, batch)
+                        db.session.commit()
+                    except SQLAlchemyError as e:
+                        db.session.rollback()
+                        errors += len(batch)
+                        print(f"⚠️  Error inserting {len(batch)} rows: {e}")
+                        continue
+                    existing.update(record["date"] for record in batch)
+                    added += len(batch)
 
-        db.session.commit()
         total = HealthEntry.query.count()
 
     print("✓ Import complete!")
@@ -0,0 +1,347 @@
+"""
+test_import_data.py
+
+Used to test the parsing helpers and the import of scripts/import_data.py
+
+Usage:
+------
+# requires uv sync --extra dev to install pytest in the virtual environment)
+>>>  uv run pytest tests/test_import_data.py
+"""
+
+from __future__ import annotations
+
+import sys
+from datetime import date
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from physiolog import create_app
+from physiolog.config import Config
+from physiolog.extensions import db
+from scripts import import_data as importer
+from scripts.import_data import (
+    _parse_date,
+    clean_frame,
+    detect_date_format,
+    detect_separator,
+    map_columns,
+    parse_date,
+    parse_time,
+    read_chunks,
+    read_columns,
+)
+
+COLUMN_MAP = {
+    "date": "Date",
+    "weight": "Weight (kg)",
+    "steps": "Steps",
+    "sleep_total": "Sleep total (h)",
+    "sleep_quality": "Sleep Quality",
+}
+
+
+def test_clean_frame_parses_columns() -> None:
+    df = pd.DataFrame(
+        {
+            "Date": ["22/09/2025", "2025-09-23", "not a date"],
+            "Weight (kg)": ["73,70", "--", "72.1"],
+            "Steps": ["11305,9", "", "9000"],
+            "Sleep total (h)": ["7:5", "7:30:36", "5:00"],
+            "Sleep Quality": ["OK :|", "--", "Good :)"],
+        }
+    )
+
+    clean, _ = clean_frame(df, COLUMN_MAP)
+
+    assert clean["date"].tolist() == [date(2025, 9, 22), date(2025, 9, 23)]
+    assert clean["weight"].iloc[0] == 73.7
+    assert pd.isna(clean["weight"].iloc[1])
+    assert clean["steps"].dtype == "Int64"
+    assert clean["steps"].iloc[0] == 11305
+    assert clean["steps"].iloc[1] is pd.NA
+    assert clean["sleep_total"].tolist() == [7.08, 7.51]
+    assert clean["sleep_quality"].iloc[0] == "OK :|"
+    assert pd.isna(clean["sleep_quality"].iloc[1])
+    assert clean["calories"].isna().all()
+
+
+def test_clean_frame_drops_invalid_rows() -> None:
+    df = pd.DataFrame(
+        {
+            "Date": ["01/01/2026", "02/01/2026", "03/01/2026", "04/01/2026", "--"],
+            "Weight (kg)": ["70", "abc", "71", "72", "73"],
+            "Sleep total (h)": ["7:00", "7:00", "7:75", "--", "7:00"],
+        }
+    )
+    column_map = {
+        "date": "Date",
+        "weight": "Weight (kg)",
+        "sleep_total": "Sleep total (h)",
+    }
+
+    clean, rejected = clean_frame(df, column_map)
+
+    assert clean["date"].tolist() == [date(2026, 1, 1), date(2026, 1, 4)]
+    assert clean["weight"].tolist() == [70.0, 72.0]
+    assert rejected.to_dict() == {1: "weight", 2: "sleep_total", 4: "date"}
+
+
+def test_clean_frame_rejects_infinite_counts() -> None:
+    df = pd.DataFrame(
+        {
+            "Date": ["01/01/2026", "02/01/2026", "03/01/2026"],
+            "Steps": ["inf", "-inf", "5"],
+        }
+    )
+
+    clean, _ = clean_frame(df, {"date": "Date", "steps": "Steps"})
+
+    assert clean["date"].tolist() == [date(2026, 1, 3)]
+    assert clean["steps"].tolist() == [5]
+
+
+def test_detect_date_format() -> None:
+    assert detect_date_format(pd.Series(["22/09/2025", "01/10/2025"])) == "%d/%m/%Y"
+    assert detect_date_format(pd.Series(["2025-09-22", None])) == "%Y-%m-%d"
+    assert detect_date_format(pd.Series(["09/22/2025", "10/01/2025"])) == "%m/%d/%Y"
+    assert detect_date_format(pd.Series(["22/09/2025", "2025-09-23"])) is None
+
+
+def test_clean_frame_falls_back_for_other_date_formats() -> None:
+    dates = ["22/09/2025"] * 25 + ["2025-10-17"]
+    df = pd.DataFrame({"Date": dates})
+
+    clean, _ = clean_frame(df, {"date": "Date"})
+
+    assert clean["date"].iloc[0] == date(2025, 9, 22)
+    assert clean["date"].iloc[-1] == date(2025, 10, 17)
+
+
+def test_read_chunks_reads_every_row(tmp_path) -> None:
+    path = tmp_path / "data.csv"
+    path.write_text("Date,Steps\n22/09/2025,11305\n23/09/2025,--\n24/09/2025,\n")
+    columns = read_columns(str(path), ",")
+
+    chunks = list(read_chunks(str(path), ",", columns, columns, chunksize=2))
+
+    assert columns == ["Date", "Steps"]
+    assert sum(len(chunk) for chunk in chunks) == 3
+
+
+def test_detect_separator(tmp_path) -> None:
+    for name, content, sep in [
+        ("a.csv", "Date,Steps\n22/09/2025,100\n", ","),
+        ("b.tsv", "Date\tSteps\n22/09/2025\t100\n", "\t"),
+        ("c.csv", "Date;Weight (kg)\n22/09/2025;73,7\n", ";"),
+        ("d.tsv", "Date\n22/09/2025\n", "\t"),
+        ("e.tsv", "Date\tWeight (kg)\tCalories, kcal\n22/09/2025\t73\t2000\n", "\t"),
+        ("f.txt", "Date\tSteps\n22/09/2025\t100\n", "\t"),
+        ("g.csv", "Date\n22/09/2025\n", ","),
+    ]:
+        path = tmp_path / name
+        path.write_text(content)
+        assert detect_separator(str(path)) == sep, name
+
+
+def test_map_columns() -> None:
+    columns = [
+        "Date",
+        "Weight (kg)",
+        "Body Fat (%)",
+        "Fat (g)",
+        "Calories",
+        "Steps",
+        "Sleep total (h)",
+        "Deep Sleep (h)",
+        "Sleep Quality",
+        "Notes",
+    ]
+
+    assert map_columns(columns) == {
+        "date": "Date",
+        "weight": "Weight (kg)",
+        "body_fat": "Body Fat (%)",
+        "calories": "Calories",
+        "steps": "Steps",
+        "sleep_total": "Sleep total (h)",
+        "sleep_quality": "Sleep Quality",
+        "observations": "Notes",
+    }
+
+
+# 01/01 is duplicated across chunks and 03/01 has invalid steps
+SAMPLE_CSV = """Date,Steps
+01/01/2026,100
+02/01/2026,200
+01/01/2026,150
+03/01/2026,abc
+04/01/2026,400
+"""
+
+
+@pytest.fixture
+def small_import(tmp_path, monkeypatch):
+    """App on a temporary SQLite file, importing in chunks of 2 and batches of 1."""
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+
+    path = tmp_path / "data.csv"
+    path.write_text(SAMPLE_CSV)
+    # pandas' C parser honours the chunk size exactly, unlike pyarrow blocks
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setattr(importer, "CHUNK_SIZE", 2)
+    monkeypatch.setattr(importer, "BATCH_SIZE", 1)
+    return create_app(TestConfig), str(path)
+
+
+def _summary(output: str) -> dict[str, int]:
+    """Parse the 'Added/Skipped/Errors' counts printed by import_data."""
+    counts = {}
+    for line in output.splitlines():
+        for name in ("Added", "Skipped", "Errors"):
+            if line.strip().startswith(f"• {name}:"):
+                counts[name] = int(line.split(":")[1].split()[0])
+    return counts
+
+
+def test_import_data_twice(small_import, capsys) -> None:
+    app, path = small_import
+
+    importer.import_data(app, path)
+    output = capsys.readouterr().out
+    assert _summary(output) == {"Added": 3, "Skipped": 1, "Errors": 1}
+    assert "Error on row 5: invalid steps" in output
+
+    importer.import_data(app, path)
+    assert _summary(capsys.readouterr().out) == {"Added": 0, "Skipped": 4, "Errors": 1}
+
+    with app.app_context():
+        assert db.session.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+
+
+def test_import_data_failed_batch(small_import, monkeypatch, capsys) -> None:
+    app, path = small_import
+    insert = db.session.bulk_insert_mappings
+
+    def failing_insert(mapper, mappings):
+        if mappings[0]["date"] == date(2026, 1, 2):
+            raise SQLAlchemyError("boom")
+        insert(mapper, mappings)
+
+    monkeypatch.setattr(db.session, "bulk_insert_mappings", failing_insert)
+
+    importer.import_data(app, path)
+
+    assert _summary(capsys.readouterr().out) == {"Added": 2, "Skipped": 1, "Errors": 2}
+    with app.app_context():
+        dates = set(db.session.scalars(db.select(importer.HealthEntry.date)))
+    assert dates == {date(2026, 1, 1), date(2026, 1, 4)}
+
+
+def test_parse_date_is_cached() -> None:
+    _parse_date.cache_clear()
+
+    assert parse_date(" 22/09/2025 ") == date(2025, 9, 22)
+    assert parse_date("22/09/2025") == date(2025, 9, 22)
+    assert parse_date("--") is None
+    assert parse_date(float("nan")) is None
+    assert parse_date("not a date") is None
+
+    info = _parse_date.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_parse_time() -> None:
+    assert parse_time("6:04") == 6.07
+    assert parse_time(" 7:5 ") == 7.08
+    assert parse_time("1:02:3") == 1.03
+    assert parse_time("--") is None
+    for value in ("7:75", "25:00", "7:30:60", "7"):
+        with pytest.raises(ValueError):
+            parse_time(value)
+
+
+def test_read_chunks_duplicate_header(tmp_path) -> None:
+    path = tmp_path / "data.csv"
+    path.write_text("Date,Steps,Steps\n22/09/2025,1,2\n")
+    columns = read_columns(str(path), ",")
+    column_map = map_columns(columns)
+
+    (chunk,) = read_chunks(str(path), ",", columns, list(column_map.values()))
+
+    assert column_map["steps"] == "Steps.1"
+    assert chunk["Steps.1"].tolist() == ["2"]
+
+
+def test_read_chunks_blank_header_across_blocks(tmp_path) -> None:
+    # > 1 MB so pyarrow reads several blocks; the blank column is only
+    # filled in the last row
+    rows = ["Date,Steps,"] + ["22/09/2025,100,"] * 150_000 + ["23/09/2025,200,x"]
+    path = tmp_path / "data.csv"
+    path.write_text("\n".join(rows) + "\n")
+    columns = read_columns(str(path), ",")
+
+    chunks = list(read_chunks(str(path), ",", columns, ["Date", "Steps"]))
+
+    assert columns[2] == "Unnamed: 2"
+    assert sum(len(chunk) for chunk in chunks) == 150_001
+    assert chunks[-1]["Steps"].iloc[-1] == "200"
+
+
+def test_map_columns_run_together_names() -> None:
+    assert map_columns(["Date", "BodyFat", "StepCount", "SleepTotal"]) == {
+        "date": "Date",
+        "body_fat": "BodyFat",
+        "steps": "StepCount",
+        "sleep_total": "SleepTotal",
+    }
+    assert map_columns(["Bodyfat %", "Updated"]) == {"body_fat": "Bodyfat %"}
+    assert map_columns(["Datetime", "stepcount", "caloriesburned", "Weight (kgs)"]) == {
+        "date": "Datetime",
+        "steps": "stepcount",
+        "calories": "caloriesburned",
+        "weight": "Weight (kgs)",
+    }
+
+
+def test_read_chunks_short_rows(tmp_path) -> None:
+    path = tmp_path / "data.csv"
+    path.write_text(
+        "Date,Steps,Observations\n"
+        "01/01/2026,100,a\n"
+        "02/01/2026\n"
+        "03/01/2026,abc,c\n"
+        "04/01/2026,200\n"
+    )
+    columns = read_columns(str(path), ",")
+
+    (chunk,) = read_chunks(str(path), ",", columns, columns)
+
+    assert chunk.index.tolist() == [2, 3, 4, 5]
+    assert chunk["Date"].tolist()[-1] == "04/01/2026"
+    assert chunk["Steps"].tolist()[-1] == "200"
+    assert chunk["Observations"].isna().tolist() == [False, True, False, True]
+
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_read_chunks_same_text_with_and_without_pyarrow(
+    tmp_path, monkeypatch, arrow
+) -> None:
+    if not arrow:
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+    path = tmp_path / "data.csv"
+    path.write_text(
+        "Date,Sleep Quality\n01/01/2026,3\n02/01/2026,None\n03/01/2026,<NA>\n"
+    )
+    columns = read_columns(str(path), ",")
+
+    (chunk,) = read_chunks(str(path), ",", columns, columns)
+
+    assert chunk.index.tolist() == [2, 3, 4]
+    assert chunk["Sleep Quality"].iloc[0] == "3"
+    assert chunk["Sleep Quality"].iloc[1:].isna().all()